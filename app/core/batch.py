@@ -0,0 +1,101 @@
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+def apply_batch(
+    db: Session,
+    model,
+    operations: list,
+    normalize: Optional[Callable[[dict], dict]] = None,
+    check: Optional[Callable[[list], None]] = None,
+):
+    """Apply a list of update/delete operations to `model` in one transaction.
+
+    Updates are grouped by the set of fields they change: a group whose values
+    are all the same becomes one `UPDATE ... WHERE id IN (...)`, any other group
+    one executemany `UPDATE ... WHERE id = ?` with a row per operation. All
+    deletes become one `DELETE ... WHERE id IN (...)`. Either every operation is
+    applied or none.
+    `check`, if given, runs once all ids are known to exist and the operations
+    are validated, and may raise to reject the batch before anything is written.
+    """
+    ids = [operation.id for operation in operations]
+    duplicate_ids = sorted(i for i, count in Counter(ids).items() if count > 1)
+    if duplicate_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Each id may appear only once per batch, duplicated: {duplicate_ids}"
+        )
+
+    existing_ids = {row[0] for row in db.query(model.id).filter(model.id.in_(ids)).all()}
+    missing_ids = [i for i in ids if i not in existing_ids]
+    if missing_ids:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Entries not found: {missing_ids}"
+        )
+
+    # Group updates by the fields they set so each group is written by one statement
+    update_groups: Dict[tuple, List[dict]] = defaultdict(list)
+    delete_ids: List[int] = []
+    results = []
+    for operation in operations:
+        if operation.op == "delete":
+            delete_ids.append(operation.id)
+            results.append({"op": "delete", "id": operation.id, "status": "deleted"})
+            continue
+
+        update_data = operation.fields.dict(exclude_unset=True) if operation.fields else {}
+        # Reject explicit nulls before normalize, which may not expect them
+        for field, value in update_data.items():
+            if value is None and not model.__table__.columns[field].nullable:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Operation update id {operation.id}: field '{field}' cannot be null"
+                )
+        if normalize:
+            update_data = normalize(update_data)
+        if update_data:
+            update_groups[tuple(sorted(update_data))].append({"id": operation.id, **update_data})
+            results.append({"op": "update", "id": operation.id, "status": "updated"})
+        else:
+            results.append({"op": "update", "id": operation.id, "status": "unchanged"})
+
+    if check:
+        check(operations)
+
+    failed_op, failed_ids = None, []
+    try:
+        for fields, rows in update_groups.items():
+            failed_op, failed_ids = "update", [row["id"] for row in rows]
+            values = {tuple(row[field] for field in fields) for row in rows}
+            if len(values) == 1:
+                db.query(model).filter(model.id.in_(failed_ids)).update(
+                    dict(zip(fields, values.pop())), synchronize_session=False
+                )
+            else:
+                db.bulk_update_mappings(model, rows)
+        if delete_ids:
+            failed_op, failed_ids = "delete", delete_ids
+            db.query(model).filter(model.id.in_(delete_ids)).delete(synchronize_session=False)
+        failed_op, failed_ids = None, []
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        target = f"operation {failed_op} ids {failed_ids}" if failed_op else "commit"
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch rejected by a database constraint at {target}: {e.orig}"
+        )
+    except Exception:
+        db.rollback()
+        raise
+
+    return {
+        "updated": sum(1 for result in results if result["status"] == "updated"),
+        "deleted": len(delete_ids),
+        "results": results,
+    }
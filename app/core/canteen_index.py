@@ -0,0 +1,279 @@
+import bisect
+import re
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.core.timetable_index import DAY_ORDER
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall((text or "").lower())
+
+class CanteenIndex:
+    """In-memory columnar index of canteen menu items.
+
+    Each item occupies a row: price in a float array, day and category as
+    small integer codes into lookup tables, plus a liveness mask. Item names are
+    tokenized into an inverted index whose posting lists are cached as row
+    arrays. Filters are evaluated as numpy masks over the columns. Loaded from the
+    database on first use and updated by the admin write endpoints.
+    """
+
+    def __init__(self, initial_capacity: int = 1024):
+        self._lock = threading.RLock()
+        self._initial_capacity = initial_capacity
+        self.loaded = False
+        self._reset()
+
+    def _reset(self):
+        capacity = self._initial_capacity
+        self._size = 0
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._prices = np.zeros(capacity, dtype=np.float64)
+        self._days = np.zeros(capacity, dtype=np.int32)
+        self._categories = np.zeros(capacity, dtype=np.int32)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._records: List[Optional[dict]] = [None] * capacity
+        self._rows: Dict[int, int] = {}
+        self._day_codes: Dict[str, int] = {}
+        self._day_names: List[str] = []
+        self._category_codes: Dict[Optional[str], int] = {}
+        self._category_names: List[Optional[str]] = []
+        self._postings: Dict[str, set] = {}
+        self._posting_arrays: Dict[str, np.ndarray] = {}
+        self._vocabulary: List[str] = []
+        self._stats = None
+
+    def ensure_loaded(self, db):
+        if self.loaded:
+            return
+        from app.models.models import CanteenMenu
+
+        with self._lock:
+            if self.loaded:
+                return
+            self._reset()
+            for item in db.query(CanteenMenu).all():
+                self._add(_record(item))
+            self.loaded = True
+
+    def invalidate(self):
+        """Drop the index so it is rebuilt from the database on next use"""
+        with self._lock:
+            self.loaded = False
+            self._reset()
+
+    @property
+    def lock(self):
+        """Hold across commit -> index update so a concurrent write can't be
+        overwritten in the index by an older version of the same item"""
+        return self._lock
+
+    def get(self, item_id: int) -> Optional[dict]:
+        with self._lock:
+            row = self._rows.get(item_id)
+            return self._records[row] if row is not None else None
+
+    def add(self, item):
+        with self._lock:
+            if self.loaded:
+                self._add(_record(item))
+
+    def update(self, item):
+        with self._lock:
+            if self.loaded:
+                self._remove(item.id)
+                self._add(_record(item))
+
+    def remove(self, item_id: int):
+        with self._lock:
+            if self.loaded:
+                self._remove(item_id)
+
+    def apply_changes(self, changes: Dict[int, Optional[dict]]):
+        """Apply committed changes (id -> new record, or None for a delete)"""
+        with self._lock:
+            if not self.loaded:
+                return
+            for item_id, record in changes.items():
+                self._remove(item_id)
+                if record is not None:
+                    self._add(record)
+
+    def search(
+        self,
+        q: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        category: Optional[str] = None,
+        day: Optional[str] = None,
+    ) -> List[dict]:
+        with self._lock:
+            size = self._size
+            mask = self._alive[:size].copy()
+            if q:
+                mask &= self._match_tokens(tokenize(q), size)
+            if min_price is not None:
+                mask &= self._prices[:size] >= min_price
+            if max_price is not None:
+                mask &= self._prices[:size] <= max_price
+            if category:
+                code = self._category_codes.get(category.lower())
+                if code is None:
+                    return []
+                mask &= self._categories[:size] == code
+            if day:
+                code = self._day_codes.get(day.capitalize())
+                if code is None:
+                    return []
+                mask &= self._days[:size] == code
+
+            rows = np.flatnonzero(mask)
+            rows = rows[np.argsort(self._ids[rows], kind="stable")]
+            return [self._records[row] for row in rows.tolist()]
+
+    def stats(self) -> List[dict]:
+        """Count and min/avg/max price per day x category"""
+        with self._lock:
+            if self._stats is None:
+                self._stats = self._build_stats()
+            return self._stats
+
+    def _match_tokens(self, tokens: List[str], size: int) -> np.ndarray:
+        """Mask of rows whose item name has a token starting with every query token"""
+        result = np.ones(size, dtype=bool)
+        for token in tokens:
+            matches = np.zeros(size, dtype=bool)
+            start = bisect.bisect_left(self._vocabulary, token)
+            for word in self._vocabulary[start:]:
+                if not word.startswith(token):
+                    break
+                matches[self._posting_rows(word)] = True
+            result &= matches
+        return result
+
+    def _posting_rows(self, word: str) -> np.ndarray:
+        rows = self._posting_arrays.get(word)
+        if rows is None:
+            postings = self._postings[word]
+            rows = self._posting_arrays[word] = np.fromiter(postings, dtype=np.int64, count=len(postings))
+        return rows
+
+    def _build_stats(self) -> List[dict]:
+        rows = np.flatnonzero(self._alive[:self._size])
+        if rows.size == 0:
+            return []
+        category_count = len(self._category_names)
+        keys = self._days[rows].astype(np.int64) * category_count + self._categories[rows]
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        prices = self._prices[rows][order]
+        group_keys, starts, counts = np.unique(keys, return_index=True, return_counts=True)
+        sums = np.add.reduceat(prices, starts)
+        minimums = np.minimum.reduceat(prices, starts)
+        maximums = np.maximum.reduceat(prices, starts)
+
+        stats = []
+        for key, count, total, minimum, maximum in zip(
+            group_keys.tolist(), counts.tolist(), sums.tolist(), minimums.tolist(), maximums.tolist()
+        ):
+            day_code, category_code = divmod(key, category_count)
+            stats.append({
+                "day": self._day_names[day_code],
+                "category": self._category_names[category_code],
+                "count": count,
+                "min_price": minimum,
+                "avg_price": round(total / count, 2),
+                "max_price": maximum,
+            })
+
+        def day_position(day):
+            return DAY_ORDER.index(day) if day in DAY_ORDER else len(DAY_ORDER)
+
+        stats.sort(key=lambda row: (day_position(row["day"]), row["day"], row["category"] or ""))
+        return stats
+
+    def _add(self, record: dict):
+        if self._size == len(self._ids):
+            self._grow()
+        row = self._size
+        self._size += 1
+
+        self._ids[row] = record["id"]
+        self._prices[row] = record["price"]
+        self._days[row] = self._encode(self._day_codes, self._day_names, record["day"])
+        self._categories[row] = self._encode(self._category_codes, self._category_names, record["category"])
+        self._alive[row] = True
+        self._records[row] = record
+        self._rows[record["id"]] = row
+
+        for token in set(tokenize(record["item"])):
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = set()
+                bisect.insort(self._vocabulary, token)
+            postings.add(row)
+            self._posting_arrays.pop(token, None)
+        self._stats = None
+
+    def _remove(self, item_id: int):
+        row = self._rows.pop(item_id, None)
+        if row is None:
+            return
+        for token in set(tokenize(self._records[row]["item"])):
+            postings = self._postings[token]
+            postings.discard(row)
+            self._posting_arrays.pop(token, None)
+            if not postings:
+                del self._postings[token]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, token)]
+        self._alive[row] = False
+        self._records[row] = None
+        self._stats = None
+
+        # Reclaim dead rows once they make up most of the arrays
+        if self._size > self._initial_capacity and len(self._rows) * 2 < self._size:
+            self._compact()
+
+    def _grow(self):
+        capacity = len(self._ids) * 2
+        for name in ("_ids", "_prices", "_days", "_categories", "_alive"):
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+        self._records.extend([None] * (capacity - len(self._records)))
+
+    def _compact(self):
+        records = [record for record in self._records[:self._size] if record is not None]
+        day_codes, day_names = self._day_codes, self._day_names
+        category_codes, category_names = self._category_codes, self._category_names
+        self._reset()
+        # Keep existing codes stable so lookup tables don't grow on every compaction
+        self._day_codes, self._day_names = day_codes, day_names
+        self._category_codes, self._category_names = category_codes, category_names
+        for record in records:
+            self._add(record)
+
+    @staticmethod
+    def _encode(codes: dict, names: list, value) -> int:
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(names)
+            names.append(value)
+        return code
+
+def _record(item) -> dict:
+    return {
+        "id": item.id,
+        "day": item.day,
+        "item": item.item,
+        "price": item.price,
+        "category": item.category,
+        "created_at": item.created_at,
+    }
+
+canteen_index = CanteenIndex()
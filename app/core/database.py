@@ -1,5 +1,10 @@
 import os
-from sqlalchemy import create_engine
+import threading
+import time
+from typing import Optional
+from fastapi import Request
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
@@ -8,17 +13,27 @@ load_dotenv()
 
 # Database URL - fallback to SQLite for development if MySQL not configured
 DATABASE_URL = os.getenv(
-    "DATABASE_URL", 
+    "DATABASE_URL",
     "sqlite:///./campus_helper.db"
 )
 
+# Optional read replica used by the GET endpoints
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+REPLICA_CHECK_INTERVAL_SECONDS = float(os.getenv("REPLICA_CHECK_INTERVAL_SECONDS", "5"))
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+
+def _create_engine(url: str):
+    if url.startswith("sqlite"):
+        return create_engine(url, connect_args={"check_same_thread": False})
+    return create_engine(url)
+
 # Create engine
-if DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-else:
-    engine = create_engine(DATABASE_URL)
+engine = _create_engine(DATABASE_URL)
+read_engine = _create_engine(DATABASE_READ_URL) if DATABASE_READ_URL else None
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine) if read_engine else None
 
 Base = declarative_base()
 
@@ -29,3 +44,88 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Read replica health, re-checked at most every REPLICA_CHECK_INTERVAL_SECONDS
+_replica_lock = threading.Lock()
+_replica_state = {"available": True, "checked_at": float("-inf")}
+
+def _check_replica() -> bool:
+    try:
+        with read_engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            if read_engine.dialect.name != "mysql":
+                return True
+            try:
+                status = connection.execute(text("SHOW REPLICA STATUS")).mappings().first()
+            except Exception:
+                # Older MySQL, or no REPLICATION CLIENT privilege: assume healthy
+                return True
+            if status is None:
+                return True  # Not configured as a replica, nothing to lag behind
+            lag = status.get("Seconds_Behind_Source", status.get("Seconds_Behind_Master"))
+            return lag is not None and lag <= REPLICA_MAX_LAG_SECONDS
+    except Exception:
+        return False
+
+def replica_available() -> bool:
+    now = time.monotonic()
+    if now - _replica_state["checked_at"] >= REPLICA_CHECK_INTERVAL_SECONDS:
+        # Only one request pays for the check; the rest use the last known state
+        if _replica_lock.acquire(blocking=False):
+            try:
+                _replica_state["available"] = _check_replica()
+                _replica_state["checked_at"] = time.monotonic()
+            finally:
+                _replica_lock.release()
+    return _replica_state["available"]
+
+def mark_replica_down():
+    _replica_state["available"] = False
+    _replica_state["checked_at"] = time.monotonic()
+
+# Read-your-writes: clients that just wrote keep reading from the primary
+_recent_writes = {}
+
+def mark_write(client_key: Optional[str]):
+    if not client_key:
+        return
+    now = time.monotonic()
+    _recent_writes[client_key] = now
+    if len(_recent_writes) > 1000:
+        for key, written_at in list(_recent_writes.items()):
+            if now - written_at > READ_YOUR_WRITES_SECONDS:
+                _recent_writes.pop(key, None)
+
+def recently_wrote(client_key: Optional[str]) -> bool:
+    written_at = _recent_writes.get(client_key) if client_key else None
+    return written_at is not None and time.monotonic() - written_at <= READ_YOUR_WRITES_SECONDS
+
+# Dependency to get a read-only session, from the replica when it is safe to use
+def get_read_db(request: Request):
+    db = None
+    if (
+        ReadSessionLocal is not None
+        and not recently_wrote(request.headers.get("authorization"))
+        and replica_available()
+    ):
+        db = ReadSessionLocal()
+        try:
+            # Probe before handing the session out so a dead replica falls back
+            # to the primary within this request instead of failing it
+            db.execute(text("SELECT 1"))
+        except OperationalError:
+            db.close()
+            db = None
+            mark_replica_down()
+
+    if db is None:
+        yield from get_db()
+        return
+
+    try:
+        yield db
+    except OperationalError:
+        mark_replica_down()
+        raise
+    finally:
+        db.close()
@@ -0,0 +1,357 @@
+import asyncio
+import logging
+import os
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+from dotenv import load_dotenv
+from sqlalchemy import and_, or_
+
+from app.core.canteen_index import canteen_index
+from app.core.database import SessionLocal
+from app.core.timetable_index import parse_time_range, timetable_index
+from app.models.models import BusSchedule, CanteenMenu, Job, Timetable
+from app.schemas.bus import BusScheduleCreate
+from app.schemas.canteen import CanteenMenuCreate
+from app.schemas.timetable import TimetableCreate
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_RETRY_BACKOFF_SECONDS = float(os.getenv("JOB_RETRY_BACKOFF_SECONDS", "2"))
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", "30"))
+# A running job whose heartbeat is older than this is assumed orphaned and re-queued.
+# On SQLite an import's open write transaction blocks heartbeats, so keep this
+# above the longest expected import there.
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "120"))
+
+# kind -> handler(params, progress) returning a JSON-serializable result
+JOB_HANDLERS: Dict[str, Callable] = {}
+
+def job_handler(kind: str):
+    """Register a function as the handler for jobs of the given kind.
+
+    Handlers run in a worker thread and receive the job params and a
+    `progress(fraction, message=None)` callback. Progress is kept in memory
+    while the job runs (so handlers holding a transaction never contend with
+    it) and saved with the final status. Raising ValueError marks the
+    input as bad and fails the job immediately; any other exception is retried
+    until the job's max_attempts is reached.
+    """
+    def register(func):
+        JOB_HANDLERS[kind] = func
+        return func
+    return register
+
+class JobRunner:
+    """In-process job queue with a bounded pool of asyncio workers.
+
+    Jobs are persisted in the `jobs` table. A job is claimed with a conditional
+    UPDATE, so with several processes sharing the table each job runs once.
+    Running jobs refresh `heartbeat_at`; jobs whose heartbeat goes stale (their
+    process died) are re-queued by any live runner.
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS):
+        self.workers = workers
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks = []
+        # job id -> (progress, message) while running; persisted when the job finishes
+        self._live_progress: Dict[int, tuple] = {}
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+
+        db = SessionLocal()
+        try:
+            pending = db.query(Job.id).filter(Job.status == "queued").order_by(Job.id).all()
+        finally:
+            db.close()
+        for (job_id,) in pending:
+            self._queue.put_nowait(job_id)
+
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._recover_stale_jobs()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._loop = None
+
+    def enqueue(self, job_id: int, delay: float = 0):
+        """Schedule a job; safe to call from request handler threads"""
+        if self._loop is None:
+            return  # Not started: the job stays queued in the table until startup
+        if delay:
+            self._loop.call_soon_threadsafe(self._loop.call_later, delay, self._queue.put_nowait, job_id)
+        else:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, job_id)
+
+    def live_progress(self, job_id: int) -> Optional[tuple]:
+        return self._live_progress.get(job_id)
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            heartbeat = asyncio.create_task(self._heartbeat(job_id))
+            try:
+                await asyncio.to_thread(self._run, job_id)
+            except Exception:
+                # e.g. the database was briefly unavailable; put the job back and try again later
+                logger.exception("Job %s could not be run, retrying", job_id)
+                try:
+                    await asyncio.to_thread(self._requeue, job_id)
+                except Exception:
+                    logger.exception("Job %s could not be re-queued; it will be recovered once stale", job_id)
+                self.enqueue(job_id, delay=JOB_RETRY_BACKOFF_SECONDS)
+            finally:
+                heartbeat.cancel()
+                self._live_progress.pop(job_id, None)
+                self._queue.task_done()
+
+    async def _heartbeat(self, job_id: int):
+        while True:
+            await asyncio.sleep(JOB_HEARTBEAT_SECONDS)
+            try:
+                await asyncio.to_thread(self._touch, job_id)
+            except Exception:
+                logger.warning("Could not refresh heartbeat for job %s", job_id, exc_info=True)
+
+    async def _recover_stale_jobs(self):
+        while True:
+            try:
+                for job_id in await asyncio.to_thread(self._requeue_stale):
+                    self._queue.put_nowait(job_id)
+            except Exception:
+                logger.exception("Could not recover stale jobs")
+            await asyncio.sleep(JOB_STALE_SECONDS / 2)
+
+    def _claim(self, db, job_id: int) -> bool:
+        now = datetime.utcnow()
+        claimed = db.query(Job).filter(Job.id == job_id, Job.status == "queued").update(
+            {
+                "status": "running",
+                "attempts": Job.attempts + 1,
+                "started_at": now,
+                "heartbeat_at": now,
+                "error": None,
+            },
+            synchronize_session=False,
+        )
+        db.commit()
+        return claimed == 1
+
+    def _touch(self, job_id: int):
+        db = SessionLocal()
+        try:
+            db.query(Job).filter(Job.id == job_id, Job.status == "running").update(
+                {"heartbeat_at": datetime.utcnow()}, synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _requeue(self, job_id: int):
+        db = SessionLocal()
+        try:
+            db.query(Job).filter(Job.id == job_id, Job.status == "running").update(
+                {"status": "queued"}, synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _requeue_stale(self) -> list:
+        cutoff = datetime.utcnow() - timedelta(seconds=JOB_STALE_SECONDS)
+        db = SessionLocal()
+        try:
+            stale = and_(Job.status == "running", or_(Job.heartbeat_at.is_(None), Job.heartbeat_at < cutoff))
+            job_ids = [row[0] for row in db.query(Job.id).filter(stale).all()]
+            if not job_ids:
+                return []
+            # Re-check staleness in the UPDATE so a job that just heartbeated is left alone
+            db.query(Job).filter(Job.id.in_(job_ids), stale).update(
+                {"status": "queued"}, synchronize_session=False
+            )
+            db.commit()
+            requeued = [row[0] for row in db.query(Job.id).filter(Job.id.in_(job_ids), Job.status == "queued").all()]
+        finally:
+            db.close()
+        for job_id in requeued:
+            logger.warning("Job %s lost its worker, re-queued", job_id)
+        return requeued
+
+    def _progress_reporter(self, job_id: int):
+        def progress(fraction: float, message: Optional[str] = None):
+            previous_message = self._live_progress.get(job_id, (0.0, None))[1]
+            message = message[:255] if message is not None else previous_message
+            self._live_progress[job_id] = (max(0.0, min(1.0, fraction)), message)
+        return progress
+
+    def _run(self, job_id: int):
+        db = SessionLocal()
+        try:
+            if not self._claim(db, job_id):
+                return  # Already taken by another worker or process, or no longer queued
+            job = db.query(Job).filter(Job.id == job_id).first()
+
+            handler = JOB_HANDLERS.get(job.kind)
+            try:
+                if handler is None:
+                    raise ValueError(f"Unknown job kind: {job.kind}")
+                result = handler(job.params or {}, self._progress_reporter(job_id))
+            except Exception as e:
+                db.refresh(job)
+                job.progress, job.message = self._live_progress.get(job_id, (job.progress, job.message))
+                job.error = f"{type(e).__name__}: {e}"
+                if isinstance(e, ValueError) or job.attempts >= job.max_attempts:
+                    job.status = "failed"
+                    job.finished_at = datetime.utcnow()
+                    db.commit()
+                    logger.warning("Job %s (%s) failed: %s", job_id, job.kind, job.error)
+                else:
+                    job.status = "queued"
+                    db.commit()
+                    self.enqueue(job_id, delay=JOB_RETRY_BACKOFF_SECONDS * 2 ** (job.attempts - 1))
+                return
+
+            db.refresh(job)
+            job.status = "succeeded"
+            job.progress = 1.0
+            job.message = self._live_progress.get(job_id, (None, job.message))[1]
+            job.result = result
+            job.finished_at = datetime.utcnow()
+            db.commit()
+        finally:
+            db.close()
+
+job_runner = JobRunner()
+
+# Built-in jobs
+
+@job_handler("warm_indexes")
+def warm_indexes(params: dict, progress):
+    """Rebuild the in-memory timetable and canteen indexes from the database"""
+    db = SessionLocal()
+    try:
+        timetable_index.invalidate()
+        timetable_index.ensure_loaded(db)
+        progress(0.5, "Timetable index rebuilt")
+        canteen_index.invalidate()
+        canteen_index.ensure_loaded(db)
+        progress(1.0, "Canteen index rebuilt")
+    finally:
+        db.close()
+    return {"indexes": ["timetable", "canteen"]}
+
+@job_handler("import_rows")
+def import_rows(params: dict, progress):
+    """Bulk insert timetable, bus or canteen rows in one transaction.
+
+    params: {"resource": "timetable" | "bus" | "canteen", "rows": [...], "chunk_size": 500}
+    """
+    resources = {
+        "timetable": (Timetable, TimetableCreate, timetable_index, _validate_timetable_rows),
+        "bus": (BusSchedule, BusScheduleCreate, None, None),
+        "canteen": (CanteenMenu, CanteenMenuCreate, canteen_index, _validate_canteen_rows),
+    }
+    resource = params.get("resource")
+    if resource not in resources:
+        raise ValueError(f"resource must be one of {sorted(resources)}")
+    model, schema, index, validate = resources[resource]
+
+    rows = []
+    for row in params.get("rows", []):
+        data = schema(**row).dict()
+        if "day" in data:
+            data["day"] = data["day"].capitalize()
+        if data.get("category"):
+            data["category"] = data["category"].lower()
+        rows.append(data)
+
+    chunk_size = max(1, int(params.get("chunk_size", 500)))
+    db = SessionLocal()
+    try:
+        # Imports get the same checks as the resource's POST endpoint
+        if validate:
+            validate(db, rows)
+        # Timetable inserts hold the index lock so no overlapping entry can be
+        # booked through the API before commit; validation stays outside it
+        with timetable_index.lock if index is timetable_index else nullcontext():
+            if index is timetable_index:
+                # In-memory only: catches entries booked since the validation above
+                _check_timetable_overlaps(db, rows)
+            for start in range(0, len(rows), chunk_size):
+                db.bulk_insert_mappings(model, rows[start:start + chunk_size])
+                db.flush()
+                done = min(start + chunk_size, len(rows))
+                progress(done / len(rows) * 0.99, f"Inserted {done}/{len(rows)} rows")
+            db.commit()
+            if index is not None:
+                index.invalidate()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    return {"resource": resource, "inserted": len(rows)}
+
+def _validate_timetable_rows(db, rows: list):
+    """Raise ValueError if imported rows have invalid times, or duplicate or newly overlap entries"""
+    for number, row in enumerate(rows, start=1):
+        if parse_time_range(row["time"]) is None:
+            raise ValueError(f"Row {number}: invalid time '{row['time']}', expected HH:MM-HH:MM with the end after the start")
+
+    placements = [(row["day"], row["time"], row["room"]) for row in rows]
+    existing = set(
+        db.query(Timetable.day, Timetable.time, Timetable.room)
+        .filter(Timetable.day.in_({day for day, _, _ in placements}))
+        .all()
+    )
+    seen = set()
+    for number, placement in enumerate(placements, start=1):
+        if placement in existing or placement in seen:
+            day, time, room = placement
+            raise ValueError(f"Row {number}: timetable entry already exists for {day} at {time} in room {room}")
+        seen.add(placement)
+
+    _check_timetable_overlaps(db, rows)
+
+def _check_timetable_overlaps(db, rows: list):
+    # Negative ids stand in for the rows that don't exist yet
+    timetable_index.ensure_loaded(db)
+    changes = {-number: {**row, "id": -number} for number, row in enumerate(rows, start=1)}
+    problems = timetable_index.check_changes(changes)
+    if problems:
+        entry = problems[0]["entry"]
+        clashes = []
+        for other_id in problems[0]["conflicts_with"]:
+            if other_id < 0:
+                clashes.append(f"row {-other_id}")
+            else:
+                other = timetable_index.get(other_id)
+                clashes.append(f"{other['subject']} ({other['time']})")
+        raise ValueError(
+            f"Row {-entry['id']}: room {entry['room']} is already booked on {entry['day']} during {entry['time']}: {', '.join(clashes)}"
+        )
+
+def _validate_canteen_rows(db, rows: list):
+    """Raise ValueError if imported rows duplicate a menu item on the same day"""
+    existing = set(
+        db.query(CanteenMenu.day, CanteenMenu.item)
+        .filter(CanteenMenu.day.in_({row["day"] for row in rows}))
+        .all()
+    )
+    seen = set()
+    for number, row in enumerate(rows, start=1):
+        key = (row["day"], row["item"])
+        if key in existing or key in seen:
+            raise ValueError(f"Row {number}: menu item '{row['item']}' already exists for {row['day']}")
+        seen.add(key)
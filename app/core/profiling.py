@@ -0,0 +1,168 @@
+import logging
+import os
+import re
+import threading
+import time
+import traceback
+from collections import deque
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Opt-in: set QUERY_PROFILING=true to record query timings
+QUERY_PROFILING = os.getenv("QUERY_PROFILING", "false").lower() in ("1", "true", "yes")
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "100"))
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", "100"))
+
+# Route of the request currently being handled, set by the profiling middleware
+current_route: ContextVar[Optional[str]] = ContextVar("current_route", default=None)
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_PROJECT_DIR = os.path.dirname(_APP_DIR)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|:\w+|\?")
+_VALUE_LIST = re.compile(r"\b(IN|VALUES)\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+# Statements whose parameters may carry credentials: never log their values
+_SENSITIVE_STATEMENT = re.compile(r"\busers\b|password|token|secret", re.IGNORECASE)
+
+def fingerprint(statement: str) -> str:
+    """Normalize a statement so queries differing only in literals group together"""
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    statement = _PLACEHOLDER.sub("?", statement)
+    statement = _VALUE_LIST.sub(r"\1 (...)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+def _redact_parameters(statement: str, parameters) -> str:
+    """repr() of the parameters, masked if the statement touches credentials"""
+    if _SENSITIVE_STATEMENT.search(statement):
+        return "[redacted]"
+    return repr(parameters)
+
+class QueryProfiler:
+    """Aggregates query timings by fingerprint and keeps a log of slow queries"""
+
+    def __init__(self, threshold_ms: float = SLOW_QUERY_THRESHOLD_MS, log_size: int = SLOW_QUERY_LOG_SIZE):
+        self.threshold_ms = threshold_ms
+        self._lock = threading.Lock()
+        self._log_size = log_size
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._fingerprints = {}
+            self._slow_queries = deque(maxlen=self._log_size)
+            self._plans = {}
+
+    def attach(self, engine):
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_times", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        start_times = conn.info.get("query_start_times")
+        if not start_times:
+            return
+        duration_ms = (time.perf_counter() - start_times.pop()) * 1000
+        key = fingerprint(statement)
+        slow = duration_ms >= self.threshold_ms
+
+        with self._lock:
+            stats = self._fingerprints.get(key)
+            if stats is None:
+                stats = self._fingerprints[key] = {
+                    "fingerprint": key,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "slow_count": 0,
+                }
+            stats["count"] += 1
+            stats["total_ms"] += duration_ms
+            stats["max_ms"] = max(stats["max_ms"], duration_ms)
+            if slow:
+                stats["slow_count"] += 1
+            plan_known = key in self._plans
+
+        if not slow:
+            return
+
+        # Capture the plan once per fingerprint; later slow runs reuse it
+        if not plan_known and not executemany:
+            plan = self._explain(conn, statement, parameters)
+            with self._lock:
+                self._plans[key] = plan
+
+        entry = {
+            "statement": statement,
+            "parameters": _redact_parameters(statement, parameters),
+            "duration_ms": round(duration_ms, 3),
+            "route": current_route.get(),
+            "stack": _app_stack(),
+            "fingerprint": key,
+            "recorded_at": time.time(),
+        }
+        with self._lock:
+            self._slow_queries.append(entry)
+        logger.warning(
+            "Slow query (%.1f ms) in %s: %s params=%s",
+            duration_ms, entry["route"], _WHITESPACE.sub(" ", statement), entry["parameters"]
+        )
+
+    def _explain(self, conn, statement, parameters):
+        if not statement.lstrip().upper().startswith("SELECT"):
+            return None
+        dialect = conn.dialect.name
+        prefix = "EXPLAIN QUERY PLAN " if dialect == "sqlite" else "EXPLAIN "
+        # Use a raw DBAPI cursor so the EXPLAIN isn't itself profiled
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(prefix + statement, parameters)
+            columns = [column[0] for column in cursor.description or ()]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        except Exception as e:
+            return [{"error": str(e)}]
+        finally:
+            cursor.close()
+
+    def report(self) -> dict:
+        with self._lock:
+            fingerprints = []
+            for stats in self._fingerprints.values():
+                fingerprints.append({
+                    **stats,
+                    "total_ms": round(stats["total_ms"], 3),
+                    "max_ms": round(stats["max_ms"], 3),
+                    "avg_ms": round(stats["total_ms"] / stats["count"], 3),
+                    "plan": self._plans.get(stats["fingerprint"]),
+                })
+            fingerprints.sort(key=lambda stats: stats["total_ms"], reverse=True)
+            slow_queries = list(reversed(self._slow_queries))
+        return {
+            "enabled": QUERY_PROFILING,
+            "threshold_ms": self.threshold_ms,
+            "fingerprints": fingerprints,
+            "slow_queries": slow_queries,
+        }
+
+def _app_stack():
+    """Frames from the application code that led to the query, innermost last"""
+    frames = []
+    for frame in traceback.extract_stack()[:-3]:
+        path = os.path.abspath(frame.filename)
+        if not path.startswith(_APP_DIR) or path == os.path.abspath(__file__):
+            continue
+        frames.append(f"{os.path.relpath(path, _PROJECT_DIR)}:{frame.lineno} in {frame.name}")
+    return frames
+
+query_profiler = QueryProfiler()
@@ -0,0 +1,372 @@
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+DAY_ORDER = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+TIME_RANGE_PATTERN = re.compile(r"^\s*(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})\s*$")
+
+def parse_time_range(time: str) -> Optional[Tuple[int, int]]:
+    """Parse "09:00-10:30" into (540, 630) minutes, or None if it isn't a valid range"""
+    match = TIME_RANGE_PATTERN.match(time or "")
+    if not match:
+        return None
+    start_hour, start_minute, end_hour, end_minute = (int(part) for part in match.groups())
+    if start_hour > 23 or end_hour > 24 or start_minute > 59 or end_minute > 59:
+        return None
+    start = start_hour * 60 + start_minute
+    end = end_hour * 60 + end_minute
+    if end <= start:
+        return None
+    return start, end
+
+class _Node:
+    __slots__ = ("key", "end", "max_end", "height", "left", "right")
+
+    def __init__(self, key, end):
+        self.key = key  # (start, end, entry_id)
+        self.end = end
+        self.max_end = end
+        self.height = 1
+        self.left = None
+        self.right = None
+
+def _height(node):
+    return node.height if node else 0
+
+def _update(node):
+    node.height = 1 + max(_height(node.left), _height(node.right))
+    node.max_end = max(
+        node.end,
+        node.left.max_end if node.left else node.end,
+        node.right.max_end if node.right else node.end,
+    )
+
+def _rotate_right(node):
+    pivot = node.left
+    node.left = pivot.right
+    pivot.right = node
+    _update(node)
+    _update(pivot)
+    return pivot
+
+def _rotate_left(node):
+    pivot = node.right
+    node.right = pivot.left
+    pivot.left = node
+    _update(node)
+    _update(pivot)
+    return pivot
+
+def _rebalance(node):
+    _update(node)
+    balance = _height(node.left) - _height(node.right)
+    if balance > 1:
+        if _height(node.left.left) < _height(node.left.right):
+            node.left = _rotate_left(node.left)
+        return _rotate_right(node)
+    if balance < -1:
+        if _height(node.right.right) < _height(node.right.left):
+            node.right = _rotate_right(node.right)
+        return _rotate_left(node)
+    return node
+
+class IntervalTree:
+    """AVL tree of half-open [start, end) intervals augmented with subtree max end.
+
+    Insert, remove and overlap queries are O(log n) (+ number of overlaps reported).
+    """
+
+    def __init__(self):
+        self.root = None
+        self.size = 0
+
+    def insert(self, start: int, end: int, entry_id: int):
+        self.root = self._insert(self.root, (start, end, entry_id), end)
+        self.size += 1
+
+    def _insert(self, node, key, end):
+        if node is None:
+            return _Node(key, end)
+        if key < node.key:
+            node.left = self._insert(node.left, key, end)
+        else:
+            node.right = self._insert(node.right, key, end)
+        return _rebalance(node)
+
+    def remove(self, start: int, end: int, entry_id: int):
+        self.root = self._remove(self.root, (start, end, entry_id))
+
+    def _remove(self, node, key):
+        if node is None:
+            return None
+        if key < node.key:
+            node.left = self._remove(node.left, key)
+        elif key > node.key:
+            node.right = self._remove(node.right, key)
+        else:
+            self.size -= 1
+            if node.left is None:
+                return node.right
+            if node.right is None:
+                return node.left
+            successor = node.right
+            while successor.left:
+                successor = successor.left
+            node.key, node.end = successor.key, successor.end
+            self.size += 1  # the successor's removal below decrements again
+            node.right = self._remove(node.right, successor.key)
+        return _rebalance(node)
+
+    def overlapping(self, start: int, end: int) -> List[int]:
+        """Return ids of intervals overlapping [start, end)"""
+        found = []
+        self._overlapping(self.root, start, end, found)
+        return found
+
+    def _overlapping(self, node, start, end, found):
+        if node is None or node.max_end <= start:
+            return
+        self._overlapping(node.left, start, end, found)
+        node_start, node_end, entry_id = node.key
+        if node_start >= end:
+            return
+        if start < node_end:
+            found.append(entry_id)
+        self._overlapping(node.right, start, end, found)
+
+class TimetableIndex:
+    """In-process index of timetable entries.
+
+    Keeps one interval tree per (day, room) so room double-booking can be
+    detected in O(log n) on every write, the set of overlapping entries for the
+    conflicts report, and a cached day x slot grid for the week view. Loaded
+    from the database on first use and updated by the write endpoints.
+
+    The index is per process: writes made by another worker process (or
+    directly against the database) are not seen until `invalidate()` is called
+    or the process restarts. Entries whose time doesn't parse (rows written
+    before the write endpoints validated times) show in the week grid but are
+    not overlap-checked.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.loaded = False
+        self._reset()
+
+    def _reset(self):
+        self._entries: Dict[int, dict] = {}
+        self._trees: Dict[Tuple[str, str], IntervalTree] = {}
+        self._overlaps: Dict[int, set] = {}
+        self._week_grid = None
+
+    def ensure_loaded(self, db):
+        if self.loaded:
+            return
+        from app.models.models import Timetable
+
+        with self._lock:
+            if self.loaded:
+                return
+            self._reset()
+            for entry in db.query(Timetable).all():
+                self._add(_record(entry))
+            self.loaded = True
+
+    def invalidate(self):
+        """Drop the index so it is rebuilt from the database on next use"""
+        with self._lock:
+            self.loaded = False
+            self._reset()
+
+    def find_conflicts(self, day: str, time: str, room: str, exclude_ids=()) -> List[dict]:
+        """Return entries in `room` on `day` whose time range overlaps `time`"""
+        interval = parse_time_range(time)
+        if interval is None:
+            return []
+        with self._lock:
+            tree = self._trees.get((day, room))
+            if tree is None:
+                return []
+            return [
+                self._entries[entry_id]
+                for entry_id in tree.overlapping(*interval)
+                if entry_id not in exclude_ids
+            ]
+
+    @property
+    def lock(self):
+        """Hold across check -> commit -> index update so concurrent writers in
+        this process can't both pass the overlap check for the same slot"""
+        return self._lock
+
+    def check_changes(self, changes: Dict[int, Optional[dict]]) -> List[dict]:
+        """Check a set of pending changes (id -> new record, or None for a delete).
+
+        Returns a list of {"entry", "conflicts_with"} for every entry whose day,
+        time or room changes and would then overlap an entry it did not already
+        overlap. Conflicts that existed before the change are not reported, so
+        legacy double-bookings can still be edited. The index is left untouched.
+        """
+        with self._lock:
+            moved = {}
+            for entry_id, record in changes.items():
+                original = self._entries.get(entry_id)
+                if record is not None and original is not None and _placement(record) == _placement(original):
+                    continue
+                moved[entry_id] = (original, record)
+
+            for original, _ in moved.values():
+                if original is not None:
+                    self._tree_remove(original)
+
+            inserted = []
+            problems = []
+            for entry_id, (_, record) in moved.items():
+                if record is None:
+                    continue
+                interval = parse_time_range(record["time"])
+                if interval is None:
+                    continue
+                tree = self._trees.setdefault((record["day"], record["room"]), IntervalTree())
+                already_overlapping = self._overlaps.get(entry_id, set())
+                overlapping = [
+                    other_id for other_id in tree.overlapping(*interval)
+                    if other_id not in already_overlapping
+                ]
+                if overlapping:
+                    problems.append({"entry": record, "conflicts_with": overlapping})
+                tree.insert(interval[0], interval[1], entry_id)
+                inserted.append(record)
+
+            for record in inserted:
+                self._tree_remove(record)
+            for original, _ in moved.values():
+                if original is not None:
+                    self._tree_insert(original)
+            return problems
+
+    def add(self, entry):
+        with self._lock:
+            if self.loaded:
+                self._add(_record(entry))
+
+    def update(self, entry):
+        with self._lock:
+            if self.loaded:
+                self._remove(entry.id)
+                self._add(_record(entry))
+
+    def remove(self, entry_id: int):
+        with self._lock:
+            if self.loaded:
+                self._remove(entry_id)
+
+    def apply_changes(self, changes: Dict[int, Optional[dict]]):
+        """Apply committed changes produced for `check_changes`"""
+        with self._lock:
+            if not self.loaded:
+                return
+            for entry_id in changes:
+                self._remove(entry_id)
+            for record in changes.values():
+                if record is not None:
+                    self._add(record)
+
+    def get(self, entry_id: int) -> Optional[dict]:
+        with self._lock:
+            return self._entries.get(entry_id)
+
+    def week_grid(self) -> dict:
+        with self._lock:
+            if self._week_grid is None:
+                self._week_grid = self._build_week_grid()
+            return self._week_grid
+
+    def conflicts(self) -> List[dict]:
+        with self._lock:
+            report = []
+            for entry_id in sorted(self._overlaps):
+                for other_id in sorted(self._overlaps[entry_id]):
+                    if other_id > entry_id:
+                        entry = self._entries[entry_id]
+                        report.append({
+                            "day": entry["day"],
+                            "room": entry["room"],
+                            "entries": [entry, self._entries[other_id]],
+                        })
+            return report
+
+    def _add(self, record: dict):
+        entry_id = record["id"]
+        self._entries[entry_id] = record
+        self._week_grid = None
+        interval = parse_time_range(record["time"])
+        if interval is None:
+            return
+        tree = self._trees.setdefault((record["day"], record["room"]), IntervalTree())
+        for other_id in tree.overlapping(*interval):
+            self._overlaps.setdefault(entry_id, set()).add(other_id)
+            self._overlaps.setdefault(other_id, set()).add(entry_id)
+        tree.insert(interval[0], interval[1], entry_id)
+
+    def _remove(self, entry_id: int):
+        record = self._entries.pop(entry_id, None)
+        if record is None:
+            return
+        self._week_grid = None
+        self._tree_remove(record)
+        for other_id in self._overlaps.pop(entry_id, ()):
+            others = self._overlaps.get(other_id)
+            if others is not None:
+                others.discard(entry_id)
+                if not others:
+                    del self._overlaps[other_id]
+
+    def _tree_insert(self, record: dict):
+        interval = parse_time_range(record["time"])
+        if interval is not None:
+            tree = self._trees.setdefault((record["day"], record["room"]), IntervalTree())
+            tree.insert(interval[0], interval[1], record["id"])
+
+    def _tree_remove(self, record: dict):
+        interval = parse_time_range(record["time"])
+        if interval is None:
+            return
+        key = (record["day"], record["room"])
+        tree = self._trees.get(key)
+        if tree is None:
+            return
+        tree.remove(interval[0], interval[1], record["id"])
+        if tree.size == 0:
+            del self._trees[key]
+
+    def _build_week_grid(self) -> dict:
+        days = list(DAY_ORDER)
+        days += sorted({entry["day"] for entry in self._entries.values()} - set(DAY_ORDER))
+
+        def slot_key(time):
+            interval = parse_time_range(time)
+            return (0, interval, time) if interval else (1, (0, 0), time)
+
+        slots = sorted({entry["time"] for entry in self._entries.values()}, key=slot_key)
+        grid = {day: {slot: [] for slot in slots} for day in days}
+        for entry in sorted(self._entries.values(), key=lambda entry: (entry["room"], entry["id"])):
+            grid[entry["day"]][entry["time"]].append(entry)
+        return {"days": days, "slots": slots, "grid": grid}
+
+def _placement(record: dict) -> tuple:
+    return record["day"], record["time"], record["room"]
+
+def _record(entry) -> dict:
+    return {
+        "id": entry.id,
+        "day": entry.day,
+        "time": entry.time,
+        "subject": entry.subject,
+        "room": entry.room,
+        "created_at": entry.created_at,
+    }
+
+timetable_index = TimetableIndex()
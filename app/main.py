@@ -1,7 +1,9 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import timetable, bus, canteen, auth
-from app.core.database import engine
+from app.routers import timetable, bus, canteen, auth, debug, admin
+from app.core.database import engine, read_engine, mark_write
+from app.core.jobs import job_runner
+from app.core.profiling import QUERY_PROFILING, current_route, query_profiler
 from app.models import models
 
 # Create database tables
@@ -22,11 +24,44 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Remember clients that just wrote so their reads skip the replica for a while
+@app.middleware("http")
+async def track_writes(request: Request, call_next):
+    response = await call_next(request)
+    if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        mark_write(request.headers.get("authorization"))
+    return response
+
+# Opt-in query profiling, viewable at /debug/queries
+if QUERY_PROFILING:
+    query_profiler.attach(engine)
+    if read_engine is not None:
+        query_profiler.attach(read_engine)
+
+    @app.middleware("http")
+    async def track_route(request: Request, call_next):
+        token = current_route.set(f"{request.method} {request.url.path}")
+        try:
+            return await call_next(request)
+        finally:
+            current_route.reset(token)
+
 # Include routers
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 app.include_router(timetable.router, prefix="/timetable", tags=["Timetable"])
 app.include_router(bus.router, prefix="/bus", tags=["Bus"])
 app.include_router(canteen.router, prefix="/canteen", tags=["Canteen"])
+app.include_router(debug.router, prefix="/debug", tags=["Debug"])
+app.include_router(admin.router, prefix="/admin", tags=["Admin"])
+
+# Background job workers
+@app.on_event("startup")
+async def start_job_runner():
+    await job_runner.start()
+
+@app.on_event("shutdown")
+async def stop_job_runner():
+    await job_runner.stop()
 
 @app.get("/")
 async def root():
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, JSON, Text
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -41,3 +41,22 @@ class CanteenMenu(Base):
     price = Column(Float, nullable=False)
     category = Column(String(50))  # breakfast, lunch, dinner, snacks
     created_at = Column(DateTime, server_default=func.now())
+
+class Job(Base):
+    __tablename__ = "jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), nullable=False)
+    params = Column(JSON)
+    status = Column(String(20), nullable=False, default="queued", index=True)  # queued, running, succeeded, failed
+    progress = Column(Float, nullable=False, default=0.0)  # 0.0 - 1.0
+    message = Column(String(255))
+    result = Column(JSON)
+    error = Column(Text)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    created_by = Column(String(50))
+    created_at = Column(DateTime, server_default=func.now())
+    started_at = Column(DateTime)
+    heartbeat_at = Column(DateTime)  # refreshed while running; stale means the worker died
+    finished_at = Column(DateTime)
@@ -0,0 +1,68 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app.core.database import get_db
+from app.core.jobs import JOB_HANDLERS, job_runner
+from app.models.models import Job, User
+from app.schemas.job import JobCreate, Job as JobSchema
+from app.routers.auth import get_current_admin_user
+
+router = APIRouter()
+
+@router.post("/jobs", response_model=JobSchema, status_code=status.HTTP_202_ACCEPTED)
+def create_job(
+    job: JobCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Queue a background job (admin only)"""
+    if job.kind not in JOB_HANDLERS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown job kind '{job.kind}'. Available: {sorted(JOB_HANDLERS)}"
+        )
+    if job.max_attempts < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="max_attempts must be at least 1"
+        )
+    
+    db_job = Job(**job.dict(), status="queued", progress=0.0, attempts=0, created_by=current_user.username)
+    db.add(db_job)
+    db.commit()
+    db.refresh(db_job)
+    job_runner.enqueue(db_job.id)
+    return db_job
+
+@router.get("/jobs", response_model=List[JobSchema])
+def list_jobs(
+    status_filter: Optional[str] = Query(None, alias="status"),
+    limit: int = 50,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """List recent background jobs (admin only)"""
+    query = db.query(Job)
+    if status_filter:
+        query = query.filter(Job.status == status_filter)
+    return query.order_by(Job.id.desc()).limit(limit).all()
+
+@router.get("/jobs/{job_id}", response_model=JobSchema)
+def get_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Get progress and result of a background job (admin only)"""
+    db_job = db.query(Job).filter(Job.id == job_id).first()
+    if not db_job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    
+    live_progress = job_runner.live_progress(job_id)
+    if db_job.status == "running" and live_progress:
+        db_job.progress, db_job.message = live_progress
+    return db_job
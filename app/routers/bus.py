@@ -2,15 +2,17 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.models.models import BusSchedule, User
-from app.schemas.bus import BusScheduleCreate, BusScheduleUpdate, BusSchedule as BusScheduleSchema
+from app.core.batch import apply_batch
+from app.schemas.batch import BatchResponse
+from app.schemas.bus import BusScheduleCreate, BusScheduleUpdate, BusScheduleBatchOperation, BusSchedule as BusScheduleSchema
 from app.routers.auth import get_current_admin_user
 
 router = APIRouter()
 
 @router.get("/{route}", response_model=List[BusScheduleSchema])
-def get_bus_timings_by_route(route: str, db: Session = Depends(get_db)):
+def get_bus_timings_by_route(route: str, db: Session = Depends(get_read_db)):
     """Fetch bus timings for a given route"""
     bus_schedules = db.query(BusSchedule).filter(BusSchedule.route.ilike(f"%{route}%")).all()
     if not bus_schedules:
@@ -21,7 +23,7 @@ def get_bus_timings_by_route(route: str, db: Session = Depends(get_db)):
     return bus_schedules
 
 @router.get("/", response_model=List[BusScheduleSchema])
-def get_all_bus_schedules(db: Session = Depends(get_db)):
+def get_all_bus_schedules(db: Session = Depends(get_read_db)):
     """Fetch all available routes with timings"""
     bus_schedules = db.query(BusSchedule).all()
     return bus_schedules
@@ -52,6 +54,15 @@ def create_bus_schedule(
     db.refresh(db_bus_schedule)
     return db_bus_schedule
 
+@router.patch("/batch", response_model=BatchResponse)
+def batch_edit_bus_schedules(
+    operations: List[BusScheduleBatchOperation],
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Apply many bus schedule updates/deletes in one transaction (admin only)"""
+    return apply_batch(db, BusSchedule, operations)
+
 @router.put("/{schedule_id}", response_model=BusScheduleSchema)
 def update_bus_schedule(
     schedule_id: int,
@@ -94,7 +105,7 @@ def delete_bus_schedule(
     return {"message": "Bus schedule deleted successfully"}
 
 @router.get("/routes/list")
-def get_available_routes(db: Session = Depends(get_db)):
+def get_available_routes(db: Session = Depends(get_read_db)):
     """Get list of all available routes"""
     routes = db.query(BusSchedule.route).distinct().all()
     return {"routes": [route[0] for route in routes]}
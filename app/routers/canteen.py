@@ -2,15 +2,37 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.models.models import CanteenMenu, User
-from app.schemas.canteen import CanteenMenuCreate, CanteenMenuUpdate, CanteenMenu as CanteenMenuSchema
+from app.core.batch import apply_batch
+from app.core.canteen_index import canteen_index
+from app.schemas.batch import BatchResponse
+from app.schemas.canteen import CanteenMenuCreate, CanteenMenuUpdate, CanteenMenuBatchOperation, CanteenMenu as CanteenMenuSchema
 from app.routers.auth import get_current_admin_user
 
 router = APIRouter()
 
+@router.get("/search", response_model=List[CanteenMenuSchema])
+def search_canteen_menu(
+    q: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    category: Optional[str] = None,
+    day: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Search menu items by name, price range, category and day"""
+    canteen_index.ensure_loaded(db)
+    return canteen_index.search(q, min_price, max_price, category, day)
+
+@router.get("/stats")
+def get_canteen_stats(db: Session = Depends(get_db)):
+    """Get item count and min/avg/max price per day and category"""
+    canteen_index.ensure_loaded(db)
+    return {"stats": canteen_index.stats()}
+
 @router.get("/{day}", response_model=List[CanteenMenuSchema])
-def get_canteen_menu_by_day(day: str, category: Optional[str] = None, db: Session = Depends(get_db)):
+def get_canteen_menu_by_day(day: str, category: Optional[str] = None, db: Session = Depends(get_read_db)):
     """Fetch menu for a specific day"""
     day = day.capitalize()  # Normalize day format
     query = db.query(CanteenMenu).filter(CanteenMenu.day == day)
@@ -22,7 +44,7 @@ def get_canteen_menu_by_day(day: str, category: Optional[str] = None, db: Sessio
     return menu_items
 
 @router.get("/", response_model=List[CanteenMenuSchema])
-def get_all_canteen_menus(category: Optional[str] = None, db: Session = Depends(get_db)):
+def get_all_canteen_menus(category: Optional[str] = None, db: Session = Depends(get_read_db)):
     """Fetch all menu items"""
     query = db.query(CanteenMenu)
     
@@ -56,11 +78,45 @@ def create_canteen_menu_item(
         )
     
     db_menu_item = CanteenMenu(**menu_item.dict())
-    db.add(db_menu_item)
-    db.commit()
-    db.refresh(db_menu_item)
+    with canteen_index.lock:
+        db.add(db_menu_item)
+        db.commit()
+        db.refresh(db_menu_item)
+        canteen_index.add(db_menu_item)
     return db_menu_item
 
+@router.patch("/batch", response_model=BatchResponse)
+def batch_edit_canteen_menu(
+    operations: List[CanteenMenuBatchOperation],
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Apply many menu item updates/deletes in one transaction (admin only)"""
+    def normalize(update_data):
+        if "day" in update_data:
+            update_data["day"] = update_data["day"].capitalize()
+        if "category" in update_data and update_data["category"]:
+            update_data["category"] = update_data["category"].lower()
+        return update_data
+
+    # Hold the index lock until the index reflects the commit, as timetable does
+    with canteen_index.lock:
+        canteen_index.ensure_loaded(db)
+        result = apply_batch(db, CanteenMenu, operations, normalize)
+
+        changes = {}
+        for operation in operations:
+            current = canteen_index.get(operation.id)
+            if current is None:
+                continue
+            if operation.op == "delete":
+                changes[operation.id] = None
+            else:
+                update_data = operation.fields.dict(exclude_unset=True) if operation.fields else {}
+                changes[operation.id] = {**current, **normalize(update_data)}
+        canteen_index.apply_changes(changes)
+    return result
+
 @router.put("/{item_id}", response_model=CanteenMenuSchema)
 def update_canteen_menu_item(
     item_id: int,
@@ -82,11 +138,13 @@ def update_canteen_menu_item(
     if "category" in update_data and update_data["category"]:
         update_data["category"] = update_data["category"].lower()
     
-    for field, value in update_data.items():
-        setattr(db_menu_item, field, value)
-    
-    db.commit()
-    db.refresh(db_menu_item)
+    with canteen_index.lock:
+        for field, value in update_data.items():
+            setattr(db_menu_item, field, value)
+        
+        db.commit()
+        db.refresh(db_menu_item)
+        canteen_index.update(db_menu_item)
     return db_menu_item
 
 @router.delete("/{item_id}")
@@ -103,12 +161,14 @@ def delete_canteen_menu_item(
             detail="Menu item not found"
         )
     
-    db.delete(db_menu_item)
-    db.commit()
+    with canteen_index.lock:
+        db.delete(db_menu_item)
+        db.commit()
+        canteen_index.remove(item_id)
     return {"message": "Menu item deleted successfully"}
 
 @router.get("/categories/list")
-def get_available_categories(db: Session = Depends(get_db)):
+def get_available_categories(db: Session = Depends(get_read_db)):
     """Get list of all available categories"""
     categories = db.query(CanteenMenu.category).distinct().all()
     return {"categories": [category[0] for category in categories if category[0]]}
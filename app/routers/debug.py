@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends
+
+from app.core.profiling import query_profiler
+from app.models.models import User
+from app.routers.auth import get_current_admin_user
+
+router = APIRouter()
+
+@router.get("/queries")
+def get_query_profile(current_user: User = Depends(get_current_admin_user)):
+    """Query timings by statement fingerprint and the slow query log (admin only)"""
+    return query_profiler.report()
+
+@router.delete("/queries")
+def reset_query_profile(current_user: User = Depends(get_current_admin_user)):
+    """Clear collected query timings (admin only)"""
+    query_profiler.reset()
+    return {"message": "Query profile cleared"}
@@ -2,22 +2,61 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.models.models import Timetable, User
-from app.schemas.timetable import TimetableCreate, TimetableUpdate, Timetable as TimetableSchema
+from app.core.batch import apply_batch
+from app.core.timetable_index import parse_time_range, timetable_index
+from app.schemas.batch import BatchResponse
+from app.schemas.timetable import TimetableCreate, TimetableUpdate, TimetableBatchOperation, Timetable as TimetableSchema
 from app.routers.auth import get_current_admin_user
 
 router = APIRouter()
 
+def _conflict_detail(day: str, time: str, room: str, conflicts: list):
+    clashes = ", ".join(f"{entry['subject']} ({entry['time']})" for entry in conflicts)
+    return f"Room {room} is already booked on {day} during {time}: {clashes}"
+
+def _invalid_time_detail(time: str):
+    """Error message for a time that isn't a valid range, or None if it is"""
+    if parse_time_range(time) is None:
+        return f"Invalid time '{time}': expected HH:MM-HH:MM with the end after the start"
+    return None
+
+def _raise_on_new_conflicts(changes: dict):
+    """Reject pending changes that would introduce a room double-booking"""
+    problems = timetable_index.check_changes(changes)
+    if problems:
+        entry = problems[0]["entry"]
+        conflicts = [
+            changes.get(entry_id) or timetable_index.get(entry_id)
+            for entry_id in problems[0]["conflicts_with"]
+        ]
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=_conflict_detail(entry["day"], entry["time"], entry["room"], conflicts)
+        )
+
+@router.get("/week")
+def get_week_timetable(db: Session = Depends(get_db)):
+    """Fetch the whole week as a day x time slot grid"""
+    timetable_index.ensure_loaded(db)
+    return timetable_index.week_grid()
+
+@router.get("/conflicts")
+def get_timetable_conflicts(db: Session = Depends(get_db)):
+    """List pairs of entries that double-book the same room"""
+    timetable_index.ensure_loaded(db)
+    return {"conflicts": timetable_index.conflicts()}
+
 @router.get("/{day}", response_model=List[TimetableSchema])
-def get_timetable_by_day(day: str, db: Session = Depends(get_db)):
+def get_timetable_by_day(day: str, db: Session = Depends(get_read_db)):
     """Fetch timetable for a specific day"""
     day = day.capitalize()  # Normalize day format
     timetables = db.query(Timetable).filter(Timetable.day == day).all()
     return timetables
 
 @router.get("/", response_model=List[TimetableSchema])
-def get_all_timetables(db: Session = Depends(get_db)):
+def get_all_timetables(db: Session = Depends(get_read_db)):
     """Fetch all timetable entries"""
     timetables = db.query(Timetable).all()
     return timetables
@@ -31,25 +70,81 @@ def create_timetable_entry(
     """Add/update class schedules (admin only)"""
     timetable.day = timetable.day.capitalize()  # Normalize day format
     
-    # Check if entry already exists for the same day, time, and room
-    existing_entry = db.query(Timetable).filter(
-        Timetable.day == timetable.day,
-        Timetable.time == timetable.time,
-        Timetable.room == timetable.room
-    ).first()
-    
-    if existing_entry:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Timetable entry already exists for {timetable.day} at {timetable.time} in room {timetable.room}"
-        )
+    # Unparseable times would escape the room overlap check
+    time_error = _invalid_time_detail(timetable.time)
+    if time_error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=time_error)
     
-    db_timetable = Timetable(**timetable.dict())
-    db.add(db_timetable)
-    db.commit()
-    db.refresh(db_timetable)
+    # Hold the index lock until the new entry is indexed so a concurrent
+    # request can't book an overlapping slot in between
+    with timetable_index.lock:
+        # Check if entry already exists for the same day, time, and room
+        existing_entry = db.query(Timetable).filter(
+            Timetable.day == timetable.day,
+            Timetable.time == timetable.time,
+            Timetable.room == timetable.room
+        ).first()
+        
+        if existing_entry:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Timetable entry already exists for {timetable.day} at {timetable.time} in room {timetable.room}"
+            )
+        
+        # Check for overlapping time ranges in the same room
+        timetable_index.ensure_loaded(db)
+        conflicts = timetable_index.find_conflicts(timetable.day, timetable.time, timetable.room)
+        if conflicts:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=_conflict_detail(timetable.day, timetable.time, timetable.room, conflicts)
+            )
+        
+        db_timetable = Timetable(**timetable.dict())
+        db.add(db_timetable)
+        db.commit()
+        db.refresh(db_timetable)
+        timetable_index.add(db_timetable)
     return db_timetable
 
+@router.patch("/batch", response_model=BatchResponse)
+def batch_edit_timetable(
+    operations: List[TimetableBatchOperation],
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Apply many timetable updates/deletes in one transaction (admin only)"""
+    def normalize(update_data):
+        if "day" in update_data:
+            update_data["day"] = update_data["day"].capitalize()
+        return update_data
+
+    changes = {}
+
+    def check(operations):
+        for operation in operations:
+            current = timetable_index.get(operation.id)
+            if current is None:
+                continue
+            if operation.op == "delete":
+                changes[operation.id] = None
+            else:
+                update_data = operation.fields.dict(exclude_unset=True) if operation.fields else {}
+                time_error = "time" in update_data and _invalid_time_detail(update_data["time"])
+                if time_error:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"Operation update id {operation.id}: {time_error}"
+                    )
+                changes[operation.id] = {**current, **normalize(update_data)}
+        _raise_on_new_conflicts(changes)
+
+    with timetable_index.lock:
+        timetable_index.ensure_loaded(db)
+        result = apply_batch(db, Timetable, operations, normalize, check)
+        timetable_index.apply_changes(changes)
+    return result
+
 @router.put("/{timetable_id}", response_model=TimetableSchema)
 def update_timetable_entry(
     timetable_id: int,
@@ -68,12 +163,26 @@ def update_timetable_entry(
     update_data = timetable_update.dict(exclude_unset=True)
     if "day" in update_data:
         update_data["day"] = update_data["day"].capitalize()
+    time_error = "time" in update_data and _invalid_time_detail(update_data["time"])
+    if time_error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=time_error)
     
-    for field, value in update_data.items():
-        setattr(db_timetable, field, value)
-    
-    db.commit()
-    db.refresh(db_timetable)
+    with timetable_index.lock:
+        # Only a new day, time or room can introduce an overlap
+        timetable_index.ensure_loaded(db)
+        current = timetable_index.get(timetable_id)
+        if current is not None and any(
+            field in update_data and update_data[field] != current[field]
+            for field in ("day", "time", "room")
+        ):
+            _raise_on_new_conflicts({timetable_id: {**current, **update_data}})
+        
+        for field, value in update_data.items():
+            setattr(db_timetable, field, value)
+        
+        db.commit()
+        db.refresh(db_timetable)
+        timetable_index.update(db_timetable)
     return db_timetable
 
 @router.delete("/{timetable_id}")
@@ -90,6 +199,8 @@ def delete_timetable_entry(
             detail="Timetable entry not found"
         )
     
-    db.delete(db_timetable)
-    db.commit()
+    with timetable_index.lock:
+        db.delete(db_timetable)
+        db.commit()
+        timetable_index.remove(timetable_id)
     return {"message": "Timetable entry deleted successfully"}
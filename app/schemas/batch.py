@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from typing import List
+
+class BatchOperationResult(BaseModel):
+    op: str
+    id: int
+    status: str
+
+class BatchResponse(BaseModel):
+    updated: int
+    deleted: int
+    results: List[BatchOperationResult]
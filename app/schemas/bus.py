@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Literal, Optional
 from datetime import datetime
 
 class BusScheduleBase(BaseModel):
@@ -21,3 +21,8 @@ class BusSchedule(BusScheduleBase):
     
     class Config:
         orm_mode = True
+
+class BusScheduleBatchOperation(BaseModel):
+    op: Literal["update", "delete"]
+    id: int
+    fields: Optional[BusScheduleUpdate] = None
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Literal, Optional
 from datetime import datetime
 
 class CanteenMenuBase(BaseModel):
@@ -23,3 +23,8 @@ class CanteenMenu(CanteenMenuBase):
     
     class Config:
         orm_mode = True  # Changed from from_attributes to orm_mode
+
+class CanteenMenuBatchOperation(BaseModel):
+    op: Literal["update", "delete"]
+    id: int
+    fields: Optional[CanteenMenuUpdate] = None
@@ -0,0 +1,28 @@
+from pydantic import BaseModel
+from typing import Any, Optional
+from datetime import datetime
+
+class JobCreate(BaseModel):
+    kind: str
+    params: dict = {}
+    max_attempts: int = 3
+
+class Job(BaseModel):
+    id: int
+    kind: str
+    params: Optional[dict] = None
+    status: str
+    progress: float
+    message: Optional[str] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    attempts: int
+    max_attempts: int
+    created_by: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        orm_mode = True
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Literal, Optional
 from datetime import datetime
 
 class TimetableBase(BaseModel):
@@ -23,3 +23,8 @@ class Timetable(TimetableBase):
     
     class Config:
         orm_mode = True
+
+class TimetableBatchOperation(BaseModel):
+    op: Literal["update", "delete"]
+    id: int
+    fields: Optional[TimetableUpdate] = None
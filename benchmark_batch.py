@@ -0,0 +1,94 @@
+"""Compare 500 admin edits sent as individual PUT/DELETE calls vs. one batch call.
+
+Runs against a throwaway SQLite database:
+
+    python benchmark_batch.py
+"""
+import os
+import tempfile
+import time
+
+db_path = os.path.join(tempfile.mkdtemp(), "benchmark.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.database import SessionLocal
+from app.core.security import get_password_hash
+from app.core.timetable_index import timetable_index
+from app.models.models import User, Timetable
+
+EDITS = 500
+
+def time_slot(minute: int) -> str:
+    """A valid 45 minute "HH:MM-HH:MM" slot starting `minute` minutes after 07:00"""
+    start = 7 * 60 + minute
+    end = start + 45
+    return f"{start // 60:02d}:{start % 60:02d}-{end // 60:02d}:{end % 60:02d}"
+
+def seed_timetable(db):
+    db.query(Timetable).delete()
+    db.add_all([
+        Timetable(day="Monday", time=time_slot(i), subject="Mathematics", room=f"Room {i}")
+        for i in range(EDITS)
+    ])
+    db.commit()
+    # Rows were written behind the API's back, so rebuild the in-memory index
+    timetable_index.invalidate()
+    return [row[0] for row in db.query(Timetable.id).order_by(Timetable.id).all()]
+
+def run_benchmark():
+    db = SessionLocal()
+    db.add(User(
+        username="bench_admin",
+        email="bench_admin@campus.edu",
+        hashed_password=get_password_hash("bench123"),
+        is_admin=True
+    ))
+    db.commit()
+
+    client = TestClient(app)
+    token = client.post(
+        "/auth/token", data={"username": "bench_admin", "password": "bench123"}
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    # An explicit null must be rejected before it reaches the day normalization
+    ids = seed_timetable(db)
+    response = client.patch(
+        "/timetable/batch", json=[{"op": "update", "id": ids[0], "fields": {"day": None}}], headers=headers
+    )
+    assert response.status_code == 400, response.text
+
+    # Half the edits move a class to its own new time slot, the other half remove one
+    start = time.perf_counter()
+    for index, entry_id in enumerate(ids):
+        if index % 2:
+            response = client.delete(f"/timetable/{entry_id}", headers=headers)
+        else:
+            response = client.put(f"/timetable/{entry_id}", json={"time": time_slot(index + 30)}, headers=headers)
+        assert response.status_code == 200, response.text
+    individual = time.perf_counter() - start
+
+    ids = seed_timetable(db)
+    operations = [
+        {"op": "delete", "id": entry_id} if index % 2
+        else {"op": "update", "id": entry_id, "fields": {"time": time_slot(index + 30)}}
+        for index, entry_id in enumerate(ids)
+    ]
+    start = time.perf_counter()
+    response = client.patch("/timetable/batch", json=operations, headers=headers)
+    batch = time.perf_counter() - start
+    assert response.status_code == 200, response.text
+    assert response.json()["deleted"] == EDITS // 2, response.json()
+    assert response.json()["updated"] == EDITS - EDITS // 2, response.json()
+    moved = dict(db.query(Timetable.id, Timetable.time).all())
+    assert all(moved[entry_id] == time_slot(index + 30) for index, entry_id in enumerate(ids) if not index % 2)
+
+    db.close()
+    print(f"{EDITS} individual calls: {individual * 1000:.1f} ms")
+    print(f"1 batch call:         {batch * 1000:.1f} ms")
+    print(f"Speedup:              {individual / batch:.1f}x")
+
+if __name__ == "__main__":
+    run_benchmark()